@@ -38,7 +38,8 @@ from setuptools import find_packages, setup
 
 
 extras = {
-    'serving': ['uvicorn', 'fastapi']
+    'serving': ['uvicorn', 'fastapi'],
+    'tokenizers': ['tokenizers>=0.14', 'protobuf'],
 }
 extras['all'] = [package for package in extras.values()]
 
@@ -60,7 +61,7 @@ setup(
                       'requests',
                       'tqdm',
                       'regex != 2019.12.17',
-                      'sentencepiece',
+                      'sentencepiece>=0.1.97',
                       'sacremoses'],
     entry_points={
       'console_scripts': [
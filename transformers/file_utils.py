@@ -42,6 +42,13 @@ try:
 except (ImportError, AssertionError):
     _tf_available = False  # pylint: disable=invalid-name
 
+try:
+    import tokenizers
+    _tokenizers_available = True  # pylint: disable=invalid-name
+    logger.info("tokenizers version {} available.".format(tokenizers.__version__))
+except ImportError:
+    _tokenizers_available = False  # pylint: disable=invalid-name
+
 try:
     from torch.hub import _get_torch_home
     torch_cache_home = _get_torch_home()
@@ -87,6 +94,9 @@ def is_torch_available():
 def is_tf_available():
     return _tf_available
 
+def is_tokenizers_available():
+    return _tokenizers_available
+
 if not six.PY2:
     def add_start_docstrings(*docstr):
         def docstring_decorator(fn):
@@ -0,0 +1,351 @@
+# coding=utf-8
+# Copyright 2019 HuggingFace Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import os
+import pickle
+import shutil
+import sys
+import tempfile
+import unittest
+
+from transformers.file_utils import is_tokenizers_available
+from transformers.tokenization_xlm_roberta import XLMRobertaTokenizer, XLMRobertaTokenizerFast, SPIECE_UNDERLINE
+
+from .tokenization_tests_commons import CommonTestCases
+
+SAMPLE_VOCAB = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                    'fixtures/test_sentencepiece.model')
+
+class XLMRobertaTokenizationTest(CommonTestCases.CommonTokenizerTester):
+
+    tokenizer_class = XLMRobertaTokenizer
+
+    def setUp(self):
+        super(XLMRobertaTokenizationTest, self).setUp()
+
+        # We have a SentencePiece fixture for testing
+        tokenizer = self.tokenizer_class(SAMPLE_VOCAB)
+        tokenizer.save_pretrained(self.tmpdirname)
+
+    def get_tokenizer(self, **kwargs):
+        # The shared padding checks expect no max_len by default, XLM-R defaults to 512
+        kwargs.setdefault('max_len', None)
+        return self.tokenizer_class.from_pretrained(self.tmpdirname, **kwargs)
+
+    def get_input_output_texts(self):
+        input_text = u"This is a test"
+        output_text = u"This is a test"
+        return input_text, output_text
+
+    def test_full_tokenizer(self):
+        tokenizer = XLMRobertaTokenizer(SAMPLE_VOCAB)
+
+        tokens = tokenizer.tokenize(u'This is a test')
+        self.assertListEqual(tokens, [u'▁This', u'▁is', u'▁a', u'▁t', u'est'])
+
+        # Ids are the spm ids shifted by fairseq_offset
+        self.assertListEqual(
+            tokenizer.convert_tokens_to_ids(tokens), [286, 47, 11, 171, 383])
+
+        self.assertListEqual(
+            tokenizer.convert_ids_to_tokens([0, 286, 47, 11, 171, 383, 2]),
+            [u'<s>', u'▁This', u'▁is', u'▁a', u'▁t', u'est', u'</s>'])
+
+        self.assertEqual(tokenizer.max_len, 512)
+        self.assertEqual(len(tokenizer.encode(u'hello', pad_to_max_length=True)), 512)
+
+        tokenizer = XLMRobertaTokenizer(SAMPLE_VOCAB, max_len=42)
+        self.assertEqual(tokenizer.max_len_single_sentence, 40)
+        self.assertEqual(tokenizer.max_len_sentences_pair, 38)
+
+        # Pieces unknown to spm are mapped to the fairseq '<unk>' and '<mask>' is the last id of the vocab
+        self.assertEqual(tokenizer.convert_tokens_to_ids(u'9'), tokenizer.unk_token_id)
+        self.assertEqual(tokenizer.mask_token_id, tokenizer.vocab_size - 1)
+
+    def test_batch_conversions(self):
+        tokenizer = XLMRobertaTokenizer(SAMPLE_VOCAB)
+        tokens = [u'<s>', u'▁This', u'<unk>', u'▁is', u'<pad>', u'</s>', u'<mask>', u'est']
+        ids = tokenizer.convert_tokens_to_ids(tokens)
+
+        self.assertListEqual(ids, [tokenizer._convert_token_to_id(token) for token in tokens])
+        self.assertListEqual(tokenizer.convert_tokens_to_ids_batch(tokens), ids)
+        self.assertListEqual(tokenizer.convert_ids_to_tokens(ids), tokens)
+        self.assertListEqual(tokenizer.convert_ids_to_tokens_batch(ids), tokens)
+        self.assertListEqual(tokenizer.convert_ids_to_tokens(ids, skip_special_tokens=True),
+                             [u'▁This', u'▁is', u'est'])
+
+        # Pieces unknown to spm are not cached but still converted
+        self.assertListEqual(tokenizer.convert_tokens_to_ids([u'9', u'▁This']), [tokenizer.unk_token_id, 286])
+        self.assertListEqual(tokenizer.convert_tokens_to_ids_batch([u'9', u'▁This']), [tokenizer.unk_token_id, 286])
+
+    @unittest.skipIf(sys.version_info[0] == 2, "pathlib is not available")
+    def test_path_vocab_file(self):
+        from pathlib import Path
+        tokenizer = XLMRobertaTokenizer(Path(SAMPLE_VOCAB))
+
+        self.assertEqual(tokenizer.vocab_file, SAMPLE_VOCAB)
+        self.assertListEqual(tokenizer.tokenize(u'This is a test'), [u'▁This', u'▁is', u'▁a', u'▁t', u'est'])
+
+    def test_spm_proto_shared(self):
+        tokenizer = XLMRobertaTokenizer(SAMPLE_VOCAB)
+        other_tokenizer = XLMRobertaTokenizer(SAMPLE_VOCAB)
+
+        self.assertIs(XLMRobertaTokenizer._load_spm_proto(SAMPLE_VOCAB),
+                      XLMRobertaTokenizer._load_spm_proto(SAMPLE_VOCAB))
+        self.assertListEqual(other_tokenizer.tokenize(u'This is a test'), tokenizer.tokenize(u'This is a test'))
+
+        # Rewriting a model file replaces its proto instead of adding one
+        tmpdirname = tempfile.mkdtemp()
+        try:
+            vocab_file = os.path.join(tmpdirname, 'sentencepiece.bpe.model')
+            shutil.copyfile(SAMPLE_VOCAB, vocab_file)
+            XLMRobertaTokenizer(vocab_file)
+            num_protos = len(XLMRobertaTokenizer._spm_protos)
+            mtime = os.path.getmtime(vocab_file)
+            os.utime(vocab_file, (mtime + 10, mtime + 10))
+            XLMRobertaTokenizer(vocab_file)
+            self.assertEqual(len(XLMRobertaTokenizer._spm_protos), num_protos)
+            self.assertEqual(XLMRobertaTokenizer._spm_protos[os.path.realpath(vocab_file)][0], mtime + 10)
+        finally:
+            shutil.rmtree(tmpdirname)
+
+    def test_save_vocabulary(self):
+        tmpdirname = tempfile.mkdtemp()
+        try:
+            tokenizer = XLMRobertaTokenizer(SAMPLE_VOCAB)
+            out_vocab_file, = tokenizer.save_vocabulary(tmpdirname)
+            self.assertTrue(os.path.samefile(out_vocab_file, SAMPLE_VOCAB) or
+                            open(out_vocab_file, 'rb').read() == open(SAMPLE_VOCAB, 'rb').read())
+
+            # Saving again, or from the saved file itself, leaves the vocabulary untouched
+            self.assertEqual(tokenizer.save_vocabulary(tmpdirname), (out_vocab_file,))
+            self.assertEqual(XLMRobertaTokenizer(out_vocab_file).save_vocabulary(tmpdirname), (out_vocab_file,))
+            self.assertListEqual(XLMRobertaTokenizer(out_vocab_file).tokenize(u'This is a test'),
+                                 tokenizer.tokenize(u'This is a test'))
+        finally:
+            shutil.rmtree(tmpdirname)
+
+    def test_pickle_without_vocab_file(self):
+        tmpdirname = tempfile.mkdtemp()
+        try:
+            vocab_file = os.path.join(tmpdirname, 'sentencepiece.bpe.model')
+            shutil.copyfile(SAMPLE_VOCAB, vocab_file)
+            tokenizer = XLMRobertaTokenizer(vocab_file)
+            pickled_tokenizer = pickle.dumps(tokenizer)
+        finally:
+            shutil.rmtree(tmpdirname)
+
+        tokenizer_new = pickle.loads(pickled_tokenizer)
+        self.assertListEqual(tokenizer_new.encode(u'This is a test'), tokenizer.encode(u'This is a test'))
+
+        # The vocabulary can still be saved, from the model held by the processor
+        tmpdirname = tempfile.mkdtemp()
+        try:
+            tokenizer_new.save_pretrained(tmpdirname)
+            tokenizer_reloaded = XLMRobertaTokenizer.from_pretrained(tmpdirname)
+            self.assertListEqual(tokenizer_reloaded.encode(u'This is a test'), tokenizer.encode(u'This is a test'))
+        finally:
+            shutil.rmtree(tmpdirname)
+
+    def test_tokenize_cache(self):
+        tokenizer = XLMRobertaTokenizer(SAMPLE_VOCAB)
+        tokenizer.tokenize_cache_size = 2
+
+        tokens = tokenizer.tokenize(u'This is a test')
+        tokens.append(u'est')
+        self.assertListEqual(tokenizer.tokenize(u'This is a test'), [u'▁This', u'▁is', u'▁a', u'▁t', u'est'])
+
+        tokenizer.tokenize(u'hello')
+        tokenizer.tokenize(u'This is a test')
+        tokenizer.tokenize(u'world')
+        self.assertListEqual(list(tokenizer._tokenize_cache), [u'This is a test', u'world'])
+
+        tokenizer.tokenize(u'a' * (tokenizer.tokenize_cache_max_len + 1))
+        self.assertEqual(len(tokenizer._tokenize_cache), 2)
+
+    def test_conversion_caches(self):
+        tokenizer = XLMRobertaTokenizer(SAMPLE_VOCAB)
+
+        for _ in range(2):
+            self.assertEqual(tokenizer._convert_token_to_id(u'▁This'), 286)
+            self.assertEqual(tokenizer._convert_token_to_id(u'<s>'), 0)
+            self.assertEqual(tokenizer._convert_token_to_id(u'9'), tokenizer.unk_token_id)
+            self.assertEqual(tokenizer._convert_id_to_token(286), u'▁This')
+            self.assertEqual(tokenizer._convert_id_to_token(tokenizer.mask_token_id), u'<mask>')
+        self.assertNotIn(u'9', tokenizer._piece_to_id)
+
+    def test_special_tokens_and_token_type_ids(self):
+        tokenizer = XLMRobertaTokenizer(SAMPLE_VOCAB)
+        ids_0, ids_1 = [10, 11, 12], [20, 21]
+
+        self.assertListEqual(tokenizer.build_inputs_with_special_tokens(ids_0), [0, 10, 11, 12, 2])
+        self.assertListEqual(tokenizer.build_inputs_with_special_tokens(ids_0, ids_1), [0, 10, 11, 12, 2, 2, 20, 21, 2])
+        self.assertListEqual(tokenizer.build_inputs_with_special_tokens([], []), [0, 2, 2, 2])
+
+        self.assertListEqual(tokenizer.create_token_type_ids_from_sequences(ids_0), [0] * 5)
+        self.assertListEqual(tokenizer.create_token_type_ids_from_sequences(ids_0, ids_1), [0] * 6 + [1] * 3)
+
+        self.assertListEqual(tokenizer.get_special_tokens_mask(ids_0), [1, 0, 0, 0, 1])
+        self.assertListEqual(tokenizer.get_special_tokens_mask(ids_0, ids_1), [1, 0, 0, 0, 1, 1, 0, 0, 1])
+        self.assertListEqual(tokenizer.get_special_tokens_mask(ids_0, ids_1),
+                             tokenizer.get_special_tokens_mask(tokenizer.build_inputs_with_special_tokens(ids_0, ids_1),
+                                                               already_has_special_tokens=True))
+
+    def test_decode(self):
+        tokenizer = XLMRobertaTokenizer(SAMPLE_VOCAB)
+        ids = tokenizer.encode(u'This is a test', u'hello world')
+
+        self.assertEqual(tokenizer.decode(ids[1:5]), u'This is a t')
+        self.assertEqual(tokenizer.decode(ids), u'<s> This is a test</s></s> hello world</s>')
+        self.assertEqual(tokenizer.decode(ids, skip_special_tokens=True), u'This is a test hello world')
+        self.assertEqual(tokenizer.decode([]), u'')
+
+        # Added tokens go through the tokens
+        tokenizer.add_tokens([u'foo'])
+        ids = tokenizer.encode(u'This is a foo test', add_special_tokens=False)
+        self.assertEqual(tokenizer.decode(ids), u'This is a foo test')
+
+    def test_decode_matches_tokens_path(self):
+        tokenizer = XLMRobertaTokenizer(SAMPLE_VOCAB)
+        tokenizer_added = XLMRobertaTokenizer(SAMPLE_VOCAB)
+        tokenizer_added.add_tokens([u'foo'])
+
+        all_ids = [tokenizer.encode(u'Hello , world .'),
+                   tokenizer.encode(u'This is a test', u'hello world'),
+                   tokenizer.encode(u'This is a <mask> test I was born in 92000.'),
+                   tokenizer.encode(u'hello world', add_special_tokens=False),
+                   [0, 2, 2],
+                   [2, 8, 905],
+                   [2, 8, 8, 905, 8, 2]]
+        for ids in all_ids:
+            for skip_special_tokens in (False, True):
+                for clean_up_tokenization_spaces in (False, True):
+                    kwargs = dict(skip_special_tokens=skip_special_tokens,
+                                  clean_up_tokenization_spaces=clean_up_tokenization_spaces)
+                    self.assertEqual(tokenizer.decode(ids, **kwargs), tokenizer_added.decode(ids, **kwargs))
+
+        # Additional special tokens from the vocabulary are spliced (or skipped) like the fairseq ones
+        tokenizer = XLMRobertaTokenizer(SAMPLE_VOCAB, additional_special_tokens=[SPIECE_UNDERLINE + u'is'])
+        for ids in all_ids:
+            for skip_special_tokens in (False, True):
+                tokens = tokenizer.convert_ids_to_tokens(ids, skip_special_tokens=skip_special_tokens)
+                self.assertEqual(tokenizer.decode(ids, skip_special_tokens=skip_special_tokens),
+                                 tokenizer.clean_up_tokenization(tokenizer.convert_tokens_to_string(tokens)))
+
+    def test_batch_encode_plus(self):
+        tokenizer = XLMRobertaTokenizer(SAMPLE_VOCAB)
+        texts = [u'This is a test', u'I was born in 92000, and this is falsé.', u'  ', u'hello world']
+
+        self.assertListEqual(tokenizer._tokenize_batch(texts[:2]), [tokenizer.tokenize(text) for text in texts[:2]])
+        self.assertListEqual(tokenizer.batch_encode_as_ids(texts),
+                             [tokenizer.encode(text, add_special_tokens=False) for text in texts])
+
+        for batch in (texts, texts + [u'This is a <mask>'], [(u'This is', u'a test'), u'hello world']):
+            encoded = [tokenizer.encode_plus(*(text if isinstance(text, tuple) else (text,)),
+                                             return_special_tokens_mask=True) for text in batch]
+            batch_encoded = tokenizer.batch_encode_plus(batch, return_special_tokens_mask=True)
+            for key in encoded[0]:
+                self.assertListEqual(batch_encoded[key], [enc[key] for enc in encoded])
+
+
+@unittest.skipUnless(is_tokenizers_available(), "tokenizers is not installed")
+class XLMRobertaTokenizationFastTest(CommonTestCases.CommonTokenizerTester):
+
+    tokenizer_class = XLMRobertaTokenizerFast
+
+    def setUp(self):
+        super(XLMRobertaTokenizationFastTest, self).setUp()
+
+        # We have a SentencePiece fixture for testing
+        tokenizer = self.tokenizer_class(SAMPLE_VOCAB)
+        tokenizer.save_pretrained(self.tmpdirname)
+
+    def get_tokenizer(self, **kwargs):
+        # The shared padding checks expect no max_len by default, XLM-R defaults to 512
+        kwargs.setdefault('max_len', None)
+        return self.tokenizer_class.from_pretrained(self.tmpdirname, **kwargs)
+
+    def get_input_output_texts(self):
+        input_text = u"This is a test"
+        output_text = u"This is a test"
+        return input_text, output_text
+
+    def test_matches_slow_tokenizer(self):
+        slow_tokenizer = XLMRobertaTokenizer(SAMPLE_VOCAB)
+        tokenizer = XLMRobertaTokenizerFast(SAMPLE_VOCAB)
+        texts = [u'This is a test', u'I was born in 92000, and this is falsé.', u'  hello   world  ']
+
+        self.assertEqual(tokenizer.vocab_size, slow_tokenizer.vocab_size)
+        for text in texts + [u'This is a <mask> ok']:
+            self.assertListEqual(tokenizer.tokenize(text), slow_tokenizer.tokenize(text))
+            self.assertListEqual(tokenizer.encode(text), slow_tokenizer.encode(text))
+        self.assertDictEqual(tokenizer.encode_plus(u'This is', u'a <mask> test', return_special_tokens_mask=True),
+                             slow_tokenizer.encode_plus(u'This is', u'a <mask> test', return_special_tokens_mask=True))
+        self.assertListEqual(tokenizer.batch_encode_as_ids(texts), slow_tokenizer.batch_encode_as_ids(texts))
+
+        self.assertListEqual(tokenizer.encode_batch(texts), [slow_tokenizer.encode(text) for text in texts])
+        self.assertListEqual(tokenizer.encode_batch([(u'This is', u'a test')]),
+                             [slow_tokenizer.encode(u'This is', u'a test')])
+        self.assertListEqual(tokenizer.encode_batch([u'This is a <mask>'], add_special_tokens=False),
+                             [slow_tokenizer.encode(u'This is a <mask>', add_special_tokens=False)])
+
+    def _modified_vocab_file(self, tmpdirname, modify):
+        """ Writes the fixture model, modified in place by `modify(proto)`, in `tmpdirname`. """
+        from sentencepiece import sentencepiece_model_pb2
+        proto = sentencepiece_model_pb2.ModelProto()
+        with open(SAMPLE_VOCAB, 'rb') as f:
+            proto.ParseFromString(f.read())
+        modify(proto)
+        vocab_file = os.path.join(tmpdirname, 'sentencepiece.bpe.model')
+        with open(vocab_file, 'wb') as f:
+            f.write(proto.SerializeToString())
+        return vocab_file
+
+    def test_non_unigram_model(self):
+        from sentencepiece import sentencepiece_model_pb2
+
+        def modify(proto):
+            proto.trainer_spec.model_type = sentencepiece_model_pb2.TrainerSpec.BPE
+
+        tmpdirname = tempfile.mkdtemp()
+        try:
+            vocab_file = self._modified_vocab_file(tmpdirname, modify)
+            with self.assertRaises(ValueError):
+                XLMRobertaTokenizerFast(vocab_file)
+        finally:
+            shutil.rmtree(tmpdirname)
+
+    def test_normalizer_spec(self):
+        # Identity-normalized model (no precompiled charsmap) keeping the whitespaces and without dummy prefix
+        def modify(proto):
+            proto.normalizer_spec.name = 'identity'
+            proto.normalizer_spec.precompiled_charsmap = b''
+            proto.normalizer_spec.add_dummy_prefix = False
+            proto.normalizer_spec.remove_extra_whitespaces = False
+
+        tmpdirname = tempfile.mkdtemp()
+        try:
+            vocab_file = self._modified_vocab_file(tmpdirname, modify)
+            slow_tokenizer = XLMRobertaTokenizer(vocab_file)
+            tokenizer = XLMRobertaTokenizerFast(vocab_file)
+            for text in [u'This is a test', u'  hello   world  ', u'\uff46\uff55\uff4c\uff4c width']:
+                self.assertListEqual(tokenizer.tokenize(text), slow_tokenizer.tokenize(text))
+                self.assertListEqual(tokenizer.encode(text), slow_tokenizer.encode(text))
+        finally:
+            shutil.rmtree(tmpdirname)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -16,15 +16,26 @@
 from __future__ import (absolute_import, division, print_function,
                         unicode_literals)
 
+import collections
 import logging
 import os
 from shutil import copyfile
 
+import numpy as np
+import six
 import sentencepiece as spm
 from transformers.tokenization_utils import PreTrainedTokenizer
 
+from .file_utils import is_tokenizers_available
+
+if is_tokenizers_available():
+    from tokenizers import Tokenizer, Regex, decoders, normalizers, pre_tokenizers, processors
+    from tokenizers.models import Unigram
+
 logger = logging.getLogger(__name__)
 
+SPIECE_UNDERLINE = u'▁'
+
 VOCAB_FILES_NAMES = {'vocab_file': 'sentencepiece.bpe.model'}
 
 PRETRAINED_VOCAB_FILES_MAP = {
@@ -40,8 +51,12 @@ PRETRAINED_VOCAB_FILES_MAP = {
 }
 
 PRETRAINED_POSITIONAL_EMBEDDINGS_SIZES = {
-    'xlm-roberta-base': None,
-    'xlm-roberta-large': None,
+    'xlm-roberta-base': 512,
+    'xlm-roberta-large': 512,
+    'xlm-roberta-large-finetuned-conll02-dutch': 512,
+    'xlm-roberta-large-finetuned-conll02-spanish': 512,
+    'xlm-roberta-large-finetuned-conll03-english': 512,
+    'xlm-roberta-large-finetuned-conll03-german': 512,
 }
 
 class XLMRobertaTokenizer(PreTrainedTokenizer):
@@ -55,18 +70,32 @@ class XLMRobertaTokenizer(PreTrainedTokenizer):
     pretrained_vocab_files_map = PRETRAINED_VOCAB_FILES_MAP
     max_model_input_sizes = PRETRAINED_POSITIONAL_EMBEDDINGS_SIZES
 
+    # Serialized SentencePiece models shared by all the tokenizers of the process, see `_load_spm_proto`
+    _spm_protos = {}
+
+    # `_tokenize` results are cached for up to `tokenize_cache_size` texts of at most `tokenize_cache_max_len`
+    # characters (set `tokenize_cache_size` to 0 to disable the cache)
+    tokenize_cache_size = 4096
+    tokenize_cache_max_len = 512
+
     def __init__(self, vocab_file, bos_token="<s>", eos_token="</s>", sep_token="</s>",
                  cls_token="<s>", unk_token="<unk>", pad_token='<pad>', mask_token='<mask>',
                  **kwargs):
-        super(XLMRobertaTokenizer, self).__init__(max_len=512, bos_token=bos_token, eos_token=eos_token, unk_token=unk_token,
+        # `from_pretrained` passes the `max_model_input_sizes` one, 512 otherwise
+        kwargs.setdefault('max_len', 512)
+        super(XLMRobertaTokenizer, self).__init__(bos_token=bos_token, eos_token=eos_token, unk_token=unk_token,
                                                  sep_token=sep_token, cls_token=cls_token, pad_token=pad_token,
                                                  mask_token=mask_token,
                                                  **kwargs)
         self.max_len_single_sentence = self.max_len - 2  # take into account special tokens
         self.max_len_sentences_pair = self.max_len - 4  # take into account special tokens
+        # Normalize path-like objects once, `_load_spm_proto` and `save_vocabulary` reuse the string
+        if not isinstance(vocab_file, six.string_types):
+            vocab_file = str(vocab_file)
         self.sp_model = spm.SentencePieceProcessor()
-        self.sp_model.Load(str(vocab_file))
+        self.sp_model.LoadFromSerializedProto(self._load_spm_proto(vocab_file))
         self.vocab_file = vocab_file
+        self._tokenize_cache = collections.OrderedDict()
 
         # Original fairseq vocab and spm vocab must be "aligned":
         # Vocab    |    0    |    1    |   2    |    3    |  4  |  5  |  6  |   7   |   8   |  9
@@ -80,9 +109,53 @@ class XLMRobertaTokenizer(PreTrainedTokenizer):
         # The first "real" token "," has position 4 in the original fairseq vocab and position 3 in the spm vocab
         self.fairseq_offset = 1
 
-        self.fairseq_tokens_to_ids['<mask>'] = len(self.sp_model) + len(self.fairseq_tokens_to_ids)
+        # The spm '<unk>', '<s>' and '</s>' are replaced by the fairseq tokens above and '<mask>' is appended at the end
+        self._spm_size = self.sp_model.GetPieceSize()
+        self.fairseq_tokens_to_ids['<mask>'] = self._spm_size + self.fairseq_offset
         self.fairseq_ids_to_tokens = {v: k for k, v in self.fairseq_tokens_to_ids.items()}
 
+        # fairseq special ids are the contiguous 0..3 ones plus '<mask>' at the end of the vocab
+        self._fairseq_max_leading_id = self.fairseq_tokens_to_ids['<unk>']
+        self._fairseq_mask_id = self.fairseq_tokens_to_ids['<mask>']
+
+        # Conversion caches filled lazily by `_convert_token_to_id` and `_convert_id_to_token`
+        self._piece_to_id = dict(self.fairseq_tokens_to_ids)
+        self._id_to_piece = [None] * self.vocab_size
+        for index, token in self.fairseq_ids_to_tokens.items():
+            self._id_to_piece[index] = token
+
+    def __getstate__(self):
+        """ The SentencePiece model is pickled as its serialized proto: unpickling (e.g. in
+            ``DataLoader`` workers) does not need ``vocab_file`` to exist on the host.
+        """
+        state = self.__dict__.copy()
+        state["sp_model"] = None
+        state["_tokenize_cache"] = collections.OrderedDict()
+        state["_spm_proto"] = self.sp_model.serialized_model_proto()
+        return state
+
+    def __setstate__(self, d):
+        spm_proto = d.pop("_spm_proto")
+        self.__dict__ = d
+        self.sp_model = spm.SentencePieceProcessor()
+        self.sp_model.LoadFromSerializedProto(spm_proto)
+
+    @classmethod
+    def _load_spm_proto(cls, vocab_file):
+        """ Reads the serialized SentencePiece model, reusing the one already read by a previous instance
+            when the file (resolved through symlinks, e.g. cache entries) has not changed since.
+            A single proto is kept per file: rewriting the file replaces it.
+        """
+        path = os.path.realpath(vocab_file)
+        mtime = os.path.getmtime(path)
+        cached = cls._spm_protos.get(path)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+        with open(path, 'rb') as f:
+            proto = f.read()
+        cls._spm_protos[path] = (mtime, proto)
+        return proto
+
     def build_inputs_with_special_tokens(self, token_ids_0, token_ids_1=None):
         """
         Build model inputs from a sequence or a pair of sequence for sequence classification tasks
@@ -91,11 +164,20 @@ class XLMRobertaTokenizer(PreTrainedTokenizer):
             single sequence: <s> X </s>
             pair of sequences: <s> A </s></s> B </s>
         """
+        cls_token_id, sep_token_id = self.cls_token_id, self.sep_token_id
         if token_ids_1 is None:
-            return [self.cls_token_id] + token_ids_0 + [self.sep_token_id]
-        cls = [self.cls_token_id]
-        sep = [self.sep_token_id]
-        return cls + token_ids_0 + sep + sep + token_ids_1 + sep
+            input_ids = [cls_token_id]
+            input_ids.extend(token_ids_0)
+            input_ids.append(sep_token_id)
+            return input_ids
+
+        # Allocate the pair once and fill it in place
+        len_0, len_1 = len(token_ids_0), len(token_ids_1)
+        input_ids = [sep_token_id] * (len_0 + len_1 + 4)
+        input_ids[0] = cls_token_id
+        input_ids[1:len_0 + 1] = token_ids_0
+        input_ids[len_0 + 3:len_0 + len_1 + 3] = token_ids_1
+        return input_ids
 
     def get_special_tokens_mask(self, token_ids_0, token_ids_1=None, already_has_special_tokens=False):
         """
@@ -116,11 +198,19 @@ class XLMRobertaTokenizer(PreTrainedTokenizer):
             if token_ids_1 is not None:
                 raise ValueError("You should not supply a second sequence if the provided sequence of "
                                  "ids is already formated with special tokens for the model.")
-            return list(map(lambda x: 1 if x in [self.sep_token_id, self.cls_token_id] else 0, token_ids_0))
+            sep_token_id, cls_token_id = self.sep_token_id, self.cls_token_id
+            return [1 if x == sep_token_id or x == cls_token_id else 0 for x in token_ids_0]
 
+        # Allocate the mask once and only flip the special token positions
+        len_0 = len(token_ids_0)
         if token_ids_1 is None:
-            return [1] + ([0] * len(token_ids_0)) + [1]
-        return [1] + ([0] * len(token_ids_0)) + [1, 1] + ([0] * len(token_ids_1)) + [1]
+            special_tokens_mask = [0] * (len_0 + 2)
+            special_tokens_mask[0] = special_tokens_mask[-1] = 1
+            return special_tokens_mask
+        special_tokens_mask = [0] * (len_0 + len(token_ids_1) + 4)
+        special_tokens_mask[0] = special_tokens_mask[len_0 + 1] = special_tokens_mask[len_0 + 2] = 1
+        special_tokens_mask[-1] = 1
+        return special_tokens_mask
 
     def create_token_type_ids_from_sequences(self, token_ids_0, token_ids_1=None):
         """
@@ -131,31 +221,239 @@ class XLMRobertaTokenizer(PreTrainedTokenizer):
 
         if token_ids_1 is None, only returns the first portion of the mask (0's).
         """
-        sep = [self.sep_token_id]
-        cls = [self.cls_token_id]
-
+        # <s> A </s></s> gets type 0 and B </s> gets type 1: 4 special tokens in total for a pair
         if token_ids_1 is None:
-            return len(cls + token_ids_0 + sep) * [0]
-        return len(cls + token_ids_0 + sep + sep) * [0] + len(token_ids_1 + sep) * [1]
+            return [0] * (len(token_ids_0) + 2)
+        return [0] * (len(token_ids_0) + 3) + [1] * (len(token_ids_1) + 1)
 
     @property
     def vocab_size(self):
-        return len(self.sp_model) + len(self.fairseq_tokens_to_ids)
+        return self._spm_size + self.fairseq_offset + 1  # Add the <mask> token
 
     def _tokenize(self, text):
+        cacheable = self.tokenize_cache_size > 0 and len(text) <= self.tokenize_cache_max_len
+        if cacheable:
+            # Pop and re-insert to mark the entry as the most recently used one
+            pieces = self._tokenize_cache.pop(text, None)
+            if pieces is not None:
+                self._tokenize_cache[text] = pieces
+                return list(pieces)
+
+        pieces = self._encode_as_pieces(text)
+        if cacheable:
+            self._tokenize_cache[text] = tuple(pieces)
+            if len(self._tokenize_cache) > self.tokenize_cache_size:
+                self._tokenize_cache.popitem(last=False)
+        return pieces
+
+    def _encode_as_pieces(self, text):
         return self.sp_model.EncodeAsPieces(text)
 
+    def _tokenize_batch(self, texts):
+        """ Converts a list of strings in a list of sequences of tokens (string) with a single
+            multi-threaded SentencePiece call.
+
+            Do NOT take care of added tokens.
+        """
+        return self.sp_model.encode(texts, out_type=str)
+
+    def batch_encode_as_ids(self, texts):
+        """ Converts a list of strings in a list of sequences of ids (integer) with a single
+            multi-threaded SentencePiece call, shifting the spm ids to the fairseq vocab.
+
+            Do NOT take care of added tokens.
+        """
+        fairseq_offset, unk_token_id = self.fairseq_offset, self.unk_token_id
+        # spm returns 0 for unknown pieces
+        return [[spm_id + fairseq_offset if spm_id else unk_token_id for spm_id in ids]
+                for ids in self.sp_model.encode(texts, out_type=int)]
+
+    def batch_encode_plus(self, batch_text_or_text_pairs, add_special_tokens=True, max_length=None, stride=0,
+                          truncation_strategy='longest_first', pad_to_max_length=False, return_tensors=None,
+                          return_token_type_ids=True, return_attention_mask=True,
+                          return_overflowing_tokens=False, return_special_tokens_mask=False, **kwargs):
+        """
+        Returns a dictionary containing the encoded sequences or sequence pairs of a batch, with the same keys
+        as ``encode_plus``, each holding a list with one entry per example.
+
+        When the batch is a list of strings without special or added tokens in them, the whole batch is
+        tokenized with a single multi-threaded SentencePiece call instead of one ``tokenize`` call per example.
+
+        Args:
+            batch_text_or_text_pairs: list of sequences or of (sequence, pair) tuples, each one being a valid
+                input of ``encode_plus``
+            Other arguments: see ``encode_plus``
+        """
+        model_kwargs = dict(max_length=max_length,
+                            add_special_tokens=add_special_tokens,
+                            stride=stride,
+                            truncation_strategy=truncation_strategy,
+                            pad_to_max_length=pad_to_max_length,
+                            return_tensors=return_tensors,
+                            return_token_type_ids=return_token_type_ids,
+                            return_attention_mask=return_attention_mask,
+                            return_overflowing_tokens=return_overflowing_tokens,
+                            return_special_tokens_mask=return_special_tokens_mask)
+
+        # Texts can skip `tokenize` when they contain no special or added token to split on
+        split_tokens = self.all_special_tokens + list(self.added_tokens_encoder)
+        if not self.init_kwargs.get('do_lower_case', False) and all(
+                isinstance(text, six.string_types) and not any(tok in text for tok in split_tokens)
+                for text in batch_text_or_text_pairs):
+            batch_ids = self.batch_encode_as_ids([text.strip() for text in batch_text_or_text_pairs])
+            batch_encoded = [self.prepare_for_model(ids, **model_kwargs) for ids in batch_ids]
+        else:
+            batch_encoded = []
+            for text in batch_text_or_text_pairs:
+                text, text_pair = text if isinstance(text, tuple) else (text, None)
+                batch_encoded.append(self.encode_plus(text, text_pair=text_pair, **dict(model_kwargs, **kwargs)))
+
+        batch_outputs = {}
+        for encoded_inputs in batch_encoded:
+            for key, value in encoded_inputs.items():
+                batch_outputs.setdefault(key, []).append(value)
+        return batch_outputs
+
     def _convert_token_to_id(self, token):
         """ Converts a token (str/unicode) in an id using the vocab. """
-        if token in self.fairseq_tokens_to_ids:
-            return self.fairseq_tokens_to_ids[token]
-        return self.sp_model.PieceToId(token) + self.fairseq_offset
+        token_id = self._piece_to_id.get(token)
+        if token_id is not None:
+            return token_id
+        spm_id = self.sp_model.PieceToId(token)
+        if not spm_id:
+            # Need to return unknown token if the SP model returned 0, not cached to keep the cache bounded
+            return self.unk_token_id
+        token_id = self._piece_to_id[token] = spm_id + self.fairseq_offset
+        return token_id
 
     def _convert_id_to_token(self, index):
         """Converts an index (integer) in a token (string/unicode) using the vocab."""
-        if index in self.fairseq_ids_to_tokens:
-            return self.fairseq_ids_to_tokens[index]
-        return self.sp_model.IdToPiece(index - self.fairseq_offset)
+        if not 0 <= index < len(self._id_to_piece):
+            return self.sp_model.IdToPiece(index - self.fairseq_offset)
+        token = self._id_to_piece[index]
+        if token is None:
+            token = self._id_to_piece[index] = self.sp_model.IdToPiece(index - self.fairseq_offset)
+        return token
+
+    def convert_tokens_to_ids(self, tokens):
+        """ Converts a single token, or a sequence of tokens, (str/unicode) in a single integer id
+            (resp. a sequence of ids), using the vocabulary.
+            Sequences are looked up directly in the conversion cache when no token has been added.
+        """
+        if isinstance(tokens, (list, tuple)) and not self.added_tokens_encoder:
+            get_id = self._piece_to_id.get
+            ids = [get_id(token) for token in tokens]
+            if None in ids:
+                # Cache misses go through (and fill) the cache of `_convert_token_to_id`
+                ids = [token_id if token_id is not None else self._convert_token_to_id(token)
+                       for token_id, token in zip(ids, tokens)]
+            return ids
+        return super(XLMRobertaTokenizer, self).convert_tokens_to_ids(tokens)
+
+    def convert_tokens_to_ids_batch(self, tokens):
+        """ Converts a sequence of tokens (str/unicode) in a sequence of ids with a single SentencePiece call,
+            bypassing the conversion cache.
+
+            Do NOT take care of added tokens.
+        """
+        get_fairseq_id, fairseq_offset, unk_token_id = self.fairseq_tokens_to_ids.get, self.fairseq_offset, self.unk_token_id
+        # A single lookup per token (-1 for no fairseq id), spm returns 0 for unknown pieces
+        token_ids = [get_fairseq_id(token, -1) for token in tokens]
+        return [token_id if token_id != -1 else (spm_id + fairseq_offset if spm_id else unk_token_id)
+                for token_id, spm_id in zip(token_ids, self.sp_model.PieceToId(list(tokens)))]
+
+    def convert_ids_to_tokens(self, ids, skip_special_tokens=False):
+        """ Converts a single index or a sequence of indices (integers) in a token "
+            (resp.) a sequence of tokens (str/unicode), using the vocabulary and added tokens.
+            Sequences are looked up directly in the conversion cache when no token has been added.
+
+            Args:
+                skip_special_tokens: Don't decode special tokens (self.all_special_tokens). Default: False
+        """
+        if isinstance(ids, (list, tuple)) and not self.added_tokens_decoder:
+            if skip_special_tokens:
+                all_special_ids = set(self.all_special_ids)
+                ids = [index for index in ids if index not in all_special_ids]
+            id_to_piece = self._id_to_piece
+            cache_size = len(id_to_piece)
+            tokens = [id_to_piece[index] if 0 <= index < cache_size else None for index in ids]
+            if None in tokens:
+                # Cache misses go through (and fill) the cache of `_convert_id_to_token`
+                tokens = [token if token is not None else self._convert_id_to_token(index)
+                          for token, index in zip(tokens, ids)]
+            return tokens
+        return super(XLMRobertaTokenizer, self).convert_ids_to_tokens(ids, skip_special_tokens=skip_special_tokens)
+
+    def convert_ids_to_tokens_batch(self, ids):
+        """ Converts a sequence of ids (integer) in a sequence of tokens (str/unicode) with a single SentencePiece call,
+            bypassing the conversion cache.
+
+            Do NOT take care of added tokens.
+        """
+        # fairseq special ids are the contiguous leading ones and '<mask>': range checks instead of dict lookups
+        max_leading_id, mask_id, fairseq_offset = self._fairseq_max_leading_id, self._fairseq_mask_id, self.fairseq_offset
+        pieces = iter(self.sp_model.IdToPiece([index - fairseq_offset for index in ids
+                                               if not 0 <= index <= max_leading_id and index != mask_id]))
+        id_to_piece = self._id_to_piece
+        return [id_to_piece[index] if 0 <= index <= max_leading_id or index == mask_id else next(pieces)
+                for index in ids]
+
+    def convert_tokens_to_string(self, tokens):
+        """Converts a sequence of tokens (strings for sub-words) in a single string."""
+        out_string = ''.join(tokens).replace(SPIECE_UNDERLINE, ' ').strip()
+        return out_string
+
+    def decode(self, token_ids, skip_special_tokens=False, clean_up_tokenization_spaces=True):
+        """
+        Converts a sequence of ids (integer) in a string, using the tokenizer and vocabulary
+        with options to remove special tokens and clean up tokenization spaces.
+        When no token has been added, each run of ids between special tokens is decoded with a
+        single SentencePiece ``DecodeIds`` call instead of going through the tokens.
+
+        Args:
+            token_ids: list of tokenized input ids. Can be obtained using the `encode` or `encode_plus` methods.
+            skip_special_tokens: if set to True, will replace special tokens.
+            clean_up_tokenization_spaces: if set to True, will clean up the tokenization spaces.
+        """
+        if self.added_tokens_decoder:
+            return super(XLMRobertaTokenizer, self).decode(token_ids, skip_special_tokens=skip_special_tokens,
+                                                           clean_up_tokenization_spaces=clean_up_tokenization_spaces)
+
+        ids = np.asarray(token_ids, dtype=np.int64).reshape(-1)
+        special = np.isin(ids, self.all_special_ids)
+        if not special.any():
+            text = self.sp_model.DecodeIds((ids - self.fairseq_offset).tolist()).strip()
+        else:
+            # Special tokens are glued to the text around them, as done by `convert_tokens_to_string`
+            sub_texts = []
+            start = 0
+            for index in np.flatnonzero(special).tolist() + [len(ids)]:
+                if start < index:
+                    spm_ids = (ids[start:index] - self.fairseq_offset).tolist()
+                    sub_text = self.sp_model.DecodeIds(spm_ids)
+                    if sub_texts:
+                        # DecodeIds drops the spaces of the leading '▁' (in '▁' only pieces too)
+                        sub_text = ' ' * self._count_leading_underlines(spm_ids) + sub_text
+                    sub_texts.append(sub_text)
+                if index < len(ids) and not skip_special_tokens:
+                    sub_texts.append(self._convert_id_to_token(int(ids[index])).replace(SPIECE_UNDERLINE, ' '))
+                start = index + 1
+            text = ''.join(sub_texts).strip()
+
+        if clean_up_tokenization_spaces:
+            text = self.clean_up_tokenization(text)
+        return text
+
+    def _count_leading_underlines(self, spm_ids):
+        """ Number of '▁' the pieces of `spm_ids` start with. """
+        count = 0
+        for spm_id in spm_ids:
+            piece = self.sp_model.IdToPiece(spm_id)
+            stripped = piece.lstrip(SPIECE_UNDERLINE)
+            count += len(piece) - len(stripped)
+            if stripped:
+                break
+        return count
 
     def save_vocabulary(self, save_directory):
         """ Save the sentencepiece vocabulary (copy original file) and special tokens file
@@ -166,7 +464,130 @@ class XLMRobertaTokenizer(PreTrainedTokenizer):
             return
         out_vocab_file = os.path.join(save_directory, VOCAB_FILES_NAMES['vocab_file'])
 
-        if os.path.abspath(self.vocab_file) != os.path.abspath(out_vocab_file):
+        vocab_file_exists = os.path.exists(self.vocab_file)
+        if os.path.exists(out_vocab_file):
+            if vocab_file_exists and os.path.samefile(self.vocab_file, out_vocab_file):
+                return (out_vocab_file,)
+            # Never write through an existing file: it may be a hardlink to another vocabulary
+            os.remove(out_vocab_file)
+
+        if not vocab_file_exists:
+            # e.g. unpickled on another host: write the model held by the processor
+            with open(out_vocab_file, 'wb') as f:
+                f.write(self.sp_model.serialized_model_proto())
+            return (out_vocab_file,)
+
+        try:
+            # Hardlinking avoids duplicating the model when both paths are on the same filesystem
+            os.link(self.vocab_file, out_vocab_file)
+        except (AttributeError, OSError):
             copyfile(self.vocab_file, out_vocab_file)
 
         return (out_vocab_file,)
+
+
+class XLMRobertaTokenizerFast(XLMRobertaTokenizer):
+    """
+        XLMRobertaTokenizer backed by the Rust `tokenizers <https://github.com/huggingface/tokenizers>`_ library.
+        The SentencePiece unigram model is converted to a ``tokenizers.Tokenizer`` at init, with the fairseq
+        vocab alignment and the ``<s> A </s></s> B </s>`` template built in. Peculiarities:
+
+            - requires `tokenizers <https://github.com/huggingface/tokenizers>`_ and `protobuf` (``pip install transformers[tokenizers]``)
+            - ``encode_batch`` encodes a whole batch natively, in parallel and without holding the GIL
+    """
+
+    def __init__(self, vocab_file, **kwargs):
+        if not is_tokenizers_available():
+            raise ImportError("You need to install tokenizers to use XLMRobertaTokenizerFast: "
+                              "https://github.com/huggingface/tokenizers "
+                              "pip install 'tokenizers>=0.14'")
+        super(XLMRobertaTokenizerFast, self).__init__(vocab_file, **kwargs)
+        self._tokenizer = self._build_tokenizer()
+
+    def _build_tokenizer(self):
+        """ Converts the SentencePiece model to a ``tokenizers.Tokenizer`` using the fairseq ids. """
+        from sentencepiece import sentencepiece_model_pb2
+        proto = sentencepiece_model_pb2.ModelProto()
+        proto.ParseFromString(self.sp_model.serialized_model_proto())
+        if proto.trainer_spec.model_type != sentencepiece_model_pb2.TrainerSpec.UNIGRAM:
+            raise ValueError("XLMRobertaTokenizerFast only supports unigram SentencePiece models, {} is a {} model. "
+                             "Use XLMRobertaTokenizer instead.".format(
+                                 self.vocab_file,
+                                 sentencepiece_model_pb2.TrainerSpec.ModelType.Name(proto.trainer_spec.model_type)))
+
+        # The fairseq special tokens replace the spm '<unk>', '<s>' and '</s>', then come the "real" spm pieces
+        # (the first one being ',') and '<mask>' last
+        fairseq_tokens = sorted(self.fairseq_tokens_to_ids, key=self.fairseq_tokens_to_ids.get)
+        vocab = [(token, 0.0) for token in fairseq_tokens[:-1]]
+        vocab += [(piece.piece, piece.score) for piece in proto.pieces[3:]]
+        vocab.append((fairseq_tokens[-1], 0.0))
+
+        tokenizer = Tokenizer(Unigram(vocab, self.fairseq_tokens_to_ids[self.unk_token], False))
+        # Follow the spm normalizer spec: identity-normalized models have no charsmap to precompile
+        normalizer_spec = proto.normalizer_spec
+        sequence = [normalizers.Strip()] if normalizer_spec.remove_extra_whitespaces else []
+        if normalizer_spec.precompiled_charsmap:
+            sequence.append(normalizers.Precompiled(normalizer_spec.precompiled_charsmap))
+        if normalizer_spec.remove_extra_whitespaces:
+            sequence.append(normalizers.Replace(Regex(" {2,}"), " "))
+        tokenizer.normalizer = normalizers.Sequence(sequence)
+        prepend_scheme = "always" if normalizer_spec.add_dummy_prefix else "never"
+        tokenizer.pre_tokenizer = pre_tokenizers.Metaspace(replacement=SPIECE_UNDERLINE, prepend_scheme=prepend_scheme)
+        tokenizer.decoder = decoders.Metaspace(replacement=SPIECE_UNDERLINE, prepend_scheme=prepend_scheme)
+        tokenizer.add_special_tokens(fairseq_tokens)
+        tokenizer.post_processor = processors.TemplateProcessing(
+            single="{cls} $A {sep}".format(cls=self.cls_token, sep=self.sep_token),
+            pair="{cls} $A {sep} {sep} $B {sep}".format(cls=self.cls_token, sep=self.sep_token),
+            special_tokens=[(self.cls_token, self.cls_token_id), (self.sep_token, self.sep_token_id)])
+        return tokenizer
+
+    def _encode_as_pieces(self, text):
+        return self._tokenizer.encode(text, add_special_tokens=False).tokens
+
+    def encode_plus(self, text, text_pair=None, add_special_tokens=True, max_length=None, stride=0,
+                    truncation_strategy='longest_first', pad_to_max_length=False, return_tensors=None,
+                    return_token_type_ids=True, return_attention_mask=True,
+                    return_overflowing_tokens=False, return_special_tokens_mask=False, **kwargs):
+        """
+        Same as ``XLMRobertaTokenizer.encode_plus``. When no token has been added, strings are
+        converted to ids by the ``tokenizers`` backend, which also recognizes the special tokens,
+        without going through ``tokenize`` and ``convert_tokens_to_ids``.
+        """
+        model_kwargs = dict(max_length=max_length,
+                            add_special_tokens=add_special_tokens,
+                            stride=stride,
+                            truncation_strategy=truncation_strategy,
+                            pad_to_max_length=pad_to_max_length,
+                            return_tensors=return_tensors,
+                            return_token_type_ids=return_token_type_ids,
+                            return_attention_mask=return_attention_mask,
+                            return_overflowing_tokens=return_overflowing_tokens,
+                            return_special_tokens_mask=return_special_tokens_mask)
+
+        if (not self.added_tokens_encoder and not self.init_kwargs.get('do_lower_case', False)
+                and isinstance(text, six.string_types)
+                and (text_pair is None or isinstance(text_pair, six.string_types))):
+            # Stripped like the texts `tokenize` splits
+            first_ids = self._tokenizer.encode(text.strip(), add_special_tokens=False).ids
+            second_ids = (self._tokenizer.encode(text_pair.strip(), add_special_tokens=False).ids
+                          if text_pair is not None else None)
+            return self.prepare_for_model(first_ids, pair_ids=second_ids, **model_kwargs)
+
+        return super(XLMRobertaTokenizerFast, self).encode_plus(text, text_pair=text_pair, **dict(model_kwargs, **kwargs))
+
+    def _tokenize_batch(self, texts):
+        return [encoding.tokens for encoding in self._tokenizer.encode_batch(texts, add_special_tokens=False)]
+
+    def batch_encode_as_ids(self, texts):
+        return [encoding.ids for encoding in self._tokenizer.encode_batch(texts, add_special_tokens=False)]
+
+    def encode_batch(self, batch_text_or_text_pairs, add_special_tokens=True):
+        """ Converts a list of strings, or of (string, pair) tuples, in a list of sequences of ids (integer)
+            with a single native call. Special tokens in the text are recognized, added tokens are not.
+
+            Args:
+                add_special_tokens: if set to ``True``, the sequences will be formated as
+                    ``<s> X </s>`` or ``<s> A </s></s> B </s>``.
+        """
+        encodings = self._tokenizer.encode_batch(batch_text_or_text_pairs, add_special_tokens=add_special_tokens)
+        return [encoding.ids for encoding in encodings]